@@ -1,16 +1,303 @@
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 import json
+import logging
+import math
+import os
 import boto3
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from datetime import datetime
+from decimal import Decimal
+import time
 import urllib.parse
 import uuid
 
-dynamodb = boto3.resource('dynamodb', region_name="us-east-1")
-table = dynamodb.Table('PatientsTable')
+try:
+    import orjson
+except ImportError:  # orjson ships in a Lambda layer; fall back to the stdlib without it
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # msgspec ships in the same layer; fall back to manual checks without it
+    msgspec = None
+
+# Scoped to this module so DEBUG doesn't switch on botocore's wire logging of patient records
+logger = logging.getLogger(__name__)
+_log_level = (os.environ.get('LOG_LEVEL') or 'INFO').upper()
+if isinstance(logging.getLevelName(_log_level), int):
+    logger.setLevel(_log_level)
+else:
+    logger.setLevel(logging.INFO)
+    logger.warning('Unknown LOG_LEVEL %r, using INFO', _log_level)
+
+# Keep the HTTPS connection to DynamoDB alive between warm invocations
+dynamodb_config = Config(
+    tcp_keepalive=True,
+    max_pool_connections=50,
+    connect_timeout=1,
+    read_timeout=3,
+    retries={'mode': 'standard', 'max_attempts': 3}
+)
+
+TABLE_NAME = 'PatientsTable'
+NOTE_PREFIX = 'Note#'
+
+# Seconds a sandbox may serve a patient or notes read from memory; 0 disables the cache
+try:
+    READ_CACHE_TTL = float(os.environ.get('READ_CACHE_TTL') or 5)
+    if not math.isfinite(READ_CACHE_TTL):
+        raise ValueError(READ_CACHE_TTL)
+except ValueError:
+    logger.warning('Invalid READ_CACHE_TTL %r, using 5 seconds', os.environ['READ_CACHE_TTL'])
+    READ_CACHE_TTL = 5.0
+READ_CACHE_MAXSIZE = 1024
+
+BATCH_GET_MAX_IDS = 100
+BATCH_MAX_ATTEMPTS = 6
+
+CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET,POST,PUT,DELETE,OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type,Authorization',
+}
+
+_client = None
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+_read_cache = {}
+
+
+def get_client():
+    # Build the client once per sandbox and reuse it on warm invocations
+    global _client
+    if _client is None:
+        _client = boto3.client('dynamodb', region_name="us-east-1", config=dynamodb_config)
+    return _client
+
+
+def _cache_get(key):
+    entry = _read_cache.get(key)
+    if entry is None:
+        return None
+    expires_at, value = entry
+    if expires_at < time.monotonic():
+        del _read_cache[key]
+        return None
+    return value
+
+
+def _cache_put(key, value):
+    if READ_CACHE_TTL <= 0:
+        return
+    if len(_read_cache) >= READ_CACHE_MAXSIZE:
+        del _read_cache[next(iter(_read_cache))]  # Drop the oldest entry
+    _read_cache[key] = (time.monotonic() + READ_CACHE_TTL, value)
+
+
+def _cache_invalidate(patient_id):
+    # Other sandboxes keep their copy until it expires, so reads may lag writes by READ_CACHE_TTL
+    _read_cache.pop(('patient', patient_id), None)
+    _read_cache.pop(('notes', patient_id), None)
+
+
+def _to_ddb(obj):
+    return {key: _serializer.serialize(value) for key, value in obj.items()}
+
+
+def _from_ddb(item):
+    return {key: _deserializer.deserialize(value) for key, value in item.items()}
+
+
+def _json_default(value):
+    # DynamoDB hands numbers back as Decimal and number sets as set
+    if isinstance(value, Decimal):
+        if value == value.to_integral_value():
+            integer = int(value)
+            # orjson only encodes 64-bit integers; DynamoDB numbers can carry 38 digits
+            if -2 ** 63 <= integer < 2 ** 64:
+                return integer
+            return str(value)
+        return float(value)
+    if isinstance(value, set):
+        return list(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def json_dumps(obj):
+    if orjson is not None:
+        return orjson.dumps(obj, default=_json_default).decode()
+    return json.dumps(obj, default=_json_default)
+
+
+def json_loads(raw):
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+# Fields a client must send to create a patient, with the type each must have
+PATIENT_FIELDS = {
+    'id': str,
+    'name': str,
+    'email': str,
+    'dateOfBirth': str,
+    'bloodType': str,
+    'allergies': list,
+    'medicalHistory': list,
+    'emergencyContacts': list,
+    'currentMedications': list,
+}
+
+if msgspec is not None:
+    class PatientIn(msgspec.Struct):
+        id: str
+        name: str
+        email: str
+        dateOfBirth: str
+        bloodType: str
+        allergies: list[str]
+        medicalHistory: list
+        emergencyContacts: list
+        currentMedications: list
+
+    _patient_decoder = msgspec.json.Decoder(PatientIn)
+
+
+def _decode_patient(raw):
+    # Raises ValueError when the body is malformed or a field is missing or mistyped
+    if msgspec is not None:
+        try:
+            return msgspec.to_builtins(_patient_decoder.decode(raw))
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+
+    body = json_loads(raw)
+    if not isinstance(body, dict):
+        raise ValueError('Expected a JSON object')
+    for field, field_type in PATIENT_FIELDS.items():
+        if field not in body:
+            raise ValueError(f'Object missing required field `{field}`')
+        if not isinstance(body[field], field_type):
+            raise ValueError(f'Expected `{field_type.__name__}` for field `{field}`')
+    # Mirror PatientIn's `allergies: list[str]`
+    for i, allergy in enumerate(body['allergies']):
+        if not isinstance(allergy, str):
+            raise ValueError(f'Expected `str` for field `allergies[{i}]`')
+    return {field: body[field] for field in PATIENT_FIELDS}
+
+
+def _wants_full(event):
+    # Writes return only what changed unless the client asks for the whole record
+    query = event.get('queryStringParameters') or {}
+    return query.get('full', '').lower() == 'true'
+
+
+def _patient_key(patient_id):
+    return {'id': {'S': patient_id}, 'type': {'S': 'Patient'}}
+
+
+def _note_sort_key(note_id):
+    return note_id if note_id.startswith(NOTE_PREFIX) else f"{NOTE_PREFIX}{note_id}"
+
+
+def _note_key(patient_id, note_id):
+    return {'id': {'S': patient_id}, 'type': {'S': _note_sort_key(note_id)}}
+
+
+def _note_item(note):
+    # Notes live next to their patient: id is the patient id, type is Note#<note id>
+    item = {key: value for key, value in note.items() if key not in ('id', 'patientId', 'type')}
+    item['id'] = note['patientId']
+    item['type'] = _note_sort_key(note['id'])
+    item['noteId'] = note['id']
+    return item
+
+
+def _note_from_item(item):
+    note = _from_ddb(item)
+    patient_id = note.pop('id')
+    note.pop('type')
+    return {'id': note.pop('noteId'), 'patientId': patient_id, 'type': 'Note', **note}
+
+
+def _query_notes(patient_id, **kwargs):
+    paginator = get_client().get_paginator('query')
+    pages = paginator.paginate(
+        TableName=TABLE_NAME,
+        KeyConditionExpression="id = :id AND begins_with(#type, :prefix)",
+        ExpressionAttributeNames={'#type': 'type'},
+        ExpressionAttributeValues={':id': {'S': patient_id}, ':prefix': {'S': NOTE_PREFIX}},
+        **kwargs
+    )
+    for page in pages:
+        yield from page['Items']
+
+
+def _query_partition(patient_id):
+    # The patient item and all of its notes
+    paginator = get_client().get_paginator('query')
+    pages = paginator.paginate(
+        TableName=TABLE_NAME,
+        KeyConditionExpression="id = :id",
+        ExpressionAttributeValues={':id': {'S': patient_id}}
+    )
+    for page in pages:
+        yield from page['Items']
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _batch_get(client, keys):
+    # BatchGetItem may return some keys unprocessed under throttling; back off and retry them
+    items = []
+    pending = {TABLE_NAME: {'Keys': keys}}
+    attempt = 0
+    while pending:
+        if attempt == BATCH_MAX_ATTEMPTS:
+            raise RuntimeError(f'BatchGetItem left keys unprocessed after {attempt} attempts')
+        if attempt:
+            time.sleep(min(0.05 * 2 ** attempt, 1))
+        response = client.batch_get_item(RequestItems=pending)
+        items.extend(response['Responses'].get(TABLE_NAME, []))
+        pending = response.get('UnprocessedKeys')
+        attempt += 1
+    return items
+
+
+def _batch_write(requests):
+    # BatchWriteItem takes at most 25 requests and may hand some of them back unprocessed
+    for start in range(0, len(requests), 25):
+        pending = {TABLE_NAME: requests[start:start + 25]}
+        attempt = 0
+        while pending:
+            if attempt == BATCH_MAX_ATTEMPTS:
+                raise RuntimeError(f'BatchWriteItem left items unprocessed after {attempt} attempts')
+            if attempt:
+                time.sleep(min(0.05 * 2 ** attempt, 1))
+            response = get_client().batch_write_item(RequestItems=pending)
+            pending = response.get('UnprocessedItems')
+            attempt += 1
+
+
+def _projection(fields):
+    # Only fetch the named attributes; placeholders avoid reserved-word clashes
+    names = {f'#f{i}': field for i, field in enumerate(fields)}
+    return {
+        'ProjectionExpression': ', '.join(names),
+        'ExpressionAttributeNames': names
+    }
 
 
 def lambda_handler(event, context):
-    print('Request event: ', json.dumps(event))  # Log the entire event object
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug('Request event: %s', json.dumps(event))  # Only serialize the event when debugging
     try:
         resource = event.get('resource', 'UNKNOWN')
         method = event.get('httpMethod', 'UNKNOWN')
@@ -18,26 +305,11 @@ def lambda_handler(event, context):
         if resource == 'UNKNOWN' or method == 'UNKNOWN':
             return response_with_cors(400, 'Invalid request. Resource or method not found.')
 
-        if resource == '/patients' and method == 'POST':
-            return create_patient(event)
-        elif resource == '/patients/{id}' and method == 'GET':
-            return get_patient(event)
-        elif resource == '/patients/{id}' and method == 'PUT':
-            return update_patient(event)
-        elif resource == '/patients/{id}' and method == 'DELETE':
-            return delete_patient(event)
-        elif resource == '/patients/{id}/notes' and method == 'POST':
-            return add_note_to_patient(event)
-        elif resource == '/patients/{id}/notes' and method == 'GET':
-            return get_all_notes_for_patient(event)
-        elif resource == '/patients/{id}/notes/{noteId}' and method == 'GET':
-            return get_note(event)
-        elif resource == '/patients/{id}/notes/{noteId}' and method == 'PUT':
-            return update_note(event)
-        elif resource == '/patients/{id}/notes/{noteId}' and method == 'DELETE':
-            return delete_note(event)
-        else:
+        handler = ROUTES.get((resource, method))
+        if handler is None:
             return response_with_cors(405, 'Method Not Allowed')
+
+        return handler(event)
     except ClientError as e:
         return response_with_cors(500, f'Error: {e.response["Error"]["Message"]}')
     except Exception as e:
@@ -47,213 +319,274 @@ def lambda_handler(event, context):
 def response_with_cors(status_code, body):
     return {
         'statusCode': status_code,
-        'headers': {
-            'Access-Control-Allow-Origin': '*',
-            'Access-Control-Allow-Methods': 'GET,POST,PUT,DELETE,OPTIONS',
-            'Access-Control-Allow-Headers': 'Content-Type,Authorization',
-        },
-        'body': json.dumps(body)
+        'headers': CORS_HEADERS,
+        'body': json_dumps(body)
     }
 
 
 def create_patient(event):
-    body = json.loads(event['body'])
+    try:
+        body = _decode_patient(event['body'])
+    except ValueError as e:
+        return response_with_cors(400, f'Invalid patient: {e}')
+
+    now = datetime.now().isoformat()
     patient = {
-        'id': body['id'],
+        **body,
         'type': 'Patient',  # Ensure 'type' is set to 'Patient'
-        'name': body['name'],
-        'email': body['email'],
-        'dateOfBirth': body['dateOfBirth'],
-        'bloodType': body['bloodType'],
-        'allergies': body['allergies'],
-        'medicalHistory': body['medicalHistory'],
-        'emergencyContacts': body['emergencyContacts'],
-        'currentMedications': body['currentMedications'],
-        'createdAt': datetime.now().isoformat(),
-        'updatedAt': datetime.now().isoformat(),
-        'notes': []
+        'createdAt': now,
+        'updatedAt': now
     }
 
-    table.put_item(Item=patient)
+    get_client().put_item(TableName=TABLE_NAME, Item=_to_ddb(patient))
+    _cache_invalidate(patient['id'])
 
     return response_with_cors(201, patient)
 
 
 def get_patient(event):
     patient_id = urllib.parse.unquote(event['pathParameters']['id'])
-
-    response = table.get_item(
-        Key={
-            'id': patient_id,
-            'type': 'Patient'
-        }
+    query = event.get('queryStringParameters') or {}
+    fields = [field.strip() for field in query.get('fields', '').split(',') if field.strip()]
+
+    # Only whole-record reads are cached; projections go straight to DynamoDB
+    if not fields:
+        patient = _cache_get(('patient', patient_id))
+        if patient is not None:
+            return response_with_cors(200, patient)
+
+    response = get_client().get_item(
+        TableName=TABLE_NAME,
+        Key=_patient_key(patient_id),
+        **(_projection(fields) if fields else {})
     )
 
     if 'Item' in response:
-        return response_with_cors(200, response['Item'])
+        patient = _from_ddb(response['Item'])
+        if not fields:
+            _cache_put(('patient', patient_id), patient)
+        return response_with_cors(200, patient)
     else:
         return response_with_cors(404, 'Patient not found')
 
 
 def update_patient(event):
     patient_id = urllib.parse.unquote(event['pathParameters']['id'])
-    body = json.loads(event['body'])
+    body = json_loads(event['body'])
 
-    update_expression = "SET "
-    expression_attribute_values = {}
+    # The key attributes and updatedAt are owned by the handler, not the client
+    for key in ('id', 'type', 'updatedAt'):
+        body.pop(key, None)
 
-    for key, value in body.items():
-        update_expression += f"{key} = :{key}, "
-        expression_attribute_values[f":{key}"] = value
-
-    update_expression += "updatedAt = :updatedAt"
-    expression_attribute_values[":updatedAt"] = datetime.now().isoformat()
+    # Client keys go through placeholders so reserved words like `name` are accepted
+    expression_attribute_names = {f"#k{i}": key for i, key in enumerate(body)}
+    expression_attribute_values = {f":v{i}": value for i, value in enumerate(body.values())}
+    update_expression = "SET " + ", ".join(
+        [f"#k{i} = :v{i}" for i in range(len(body))] + ["updatedAt = :updatedAt"]
+    )
+    expression_attribute_values[':updatedAt'] = datetime.now().isoformat()
 
-    response = table.update_item(
-        Key={
-            'id': patient_id,
-            'type': 'Patient'
-        },
+    response = get_client().update_item(
+        TableName=TABLE_NAME,
+        Key=_patient_key(patient_id),
         UpdateExpression=update_expression,
-        ExpressionAttributeValues=expression_attribute_values,
-        ReturnValues="ALL_NEW"
+        ExpressionAttributeValues=_to_ddb(expression_attribute_values),
+        ReturnValues="ALL_NEW" if _wants_full(event) else "UPDATED_NEW",
+        **({'ExpressionAttributeNames': expression_attribute_names} if expression_attribute_names else {})
     )
+    _cache_invalidate(patient_id)
 
-    return response_with_cors(200, response['Attributes'])
+    return response_with_cors(200, _from_ddb(response['Attributes']))
 
 
 def delete_patient(event):
     patient_id = urllib.parse.unquote(event['pathParameters']['id'])
 
-    table.delete_item(
-        Key={
-            'id': patient_id,
-            'type': 'Patient'
-        }
-    )
+    # Notes are separate items; remove them before the patient so a retried DELETE finishes the cleanup
+    note_keys = _query_notes(patient_id, ProjectionExpression="id, #type")
+    _batch_write([{'DeleteRequest': {'Key': key}} for key in note_keys])
+
+    get_client().delete_item(TableName=TABLE_NAME, Key=_patient_key(patient_id))
+    _cache_invalidate(patient_id)
 
     return response_with_cors(204, None)
 
 
 def add_note_to_patient(event):
     patient_id = urllib.parse.unquote(event['pathParameters']['id'])
-    body = json.loads(event['body'])
+    body = json_loads(event['body'])
 
     # Generate a unique ID for the note if not provided
-    note_id = body.get('id', f"Note#{uuid.uuid4()}")
+    note_id = body.get('id', f"{NOTE_PREFIX}{uuid.uuid4()}")
 
     # Validate required fields
     if 'author' not in body or 'content' not in body:
         return response_with_cors(400, 'Missing required fields: author and content are required.')
 
+    if not isinstance(note_id, str):
+        return response_with_cors(400, 'Invalid field: id must be a string.')
+
     # Ensure content is a list of strings, with at least one string
     content_list = [body['content']] if isinstance(body['content'], str) else body['content']
+    now = datetime.now().isoformat()
 
     note = {
         'id': note_id,
         'patientId': patient_id,
         'author': body['author'],
-        'createdAt': datetime.now().isoformat(),
-        'updatedAt': datetime.now().isoformat(),
+        'createdAt': now,
+        'updatedAt': now,
         'type': 'Note',
         'content': content_list  # Ensure content is a list of strings
     }
 
     try:
-        response = table.update_item(
-            Key={'id': patient_id, 'type': 'Patient'},
-            UpdateExpression="SET notes = list_append(if_not_exists(notes, :empty_list), :note)",
-            ExpressionAttributeValues={
-                ':note': [note],
-                ':empty_list': []
-            },
-            ReturnValues="ALL_NEW"
+        # Only attach notes to an existing patient, and never overwrite an existing note;
+        # note ids `abc` and `Note#abc` share one key
+        get_client().transact_write_items(
+            TransactItems=[
+                {
+                    'ConditionCheck': {
+                        'TableName': TABLE_NAME,
+                        'Key': _patient_key(patient_id),
+                        'ConditionExpression': "attribute_exists(id)"
+                    }
+                },
+                {
+                    'Put': {
+                        'TableName': TABLE_NAME,
+                        'Item': _to_ddb(_note_item(note)),
+                        'ConditionExpression': "attribute_not_exists(id)"
+                    }
+                }
+            ]
         )
-        return response_with_cors(201, response['Attributes'])
+        _cache_invalidate(patient_id)
+        return response_with_cors(201, note)
     except ClientError as e:
+        if e.response['Error']['Code'] == 'TransactionCanceledException':
+            # Reasons are reported in TransactItems order: patient check, then note put
+            patient_reason, note_reason = [reason.get('Code') for reason in e.response['CancellationReasons']]
+            if patient_reason == 'ConditionalCheckFailed':
+                return response_with_cors(404, 'Patient not found')
+            if note_reason == 'ConditionalCheckFailed':
+                return response_with_cors(409, f'Note {note_id} already exists')
         return response_with_cors(500, f"Error adding note: {e.response['Error']['Message']}")
 
 
 def get_all_notes_for_patient(event):
     patient_id = urllib.parse.unquote(event['pathParameters']['id'])
 
-    response = table.get_item(Key={'id': patient_id, 'type': 'Patient'})
+    notes = _cache_get(('notes', patient_id))
+    if notes is None:
+        # Read the whole partition so a patient with no notes still answers with an empty list
+        items = list(_query_partition(patient_id))
+        if not any(item['type']['S'] == 'Patient' for item in items):
+            return response_with_cors(404, 'No notes found for this patient')
 
-    if 'Item' in response and 'notes' in response['Item']:
-        return response_with_cors(200, response['Item']['notes'])
-    else:
-        return response_with_cors(404, 'No notes found for this patient')
+        # Sort keys are Note#<uuid>, so restore the chronological order the notes were added in
+        notes = [_note_from_item(item) for item in items if item['type']['S'].startswith(NOTE_PREFIX)]
+        notes.sort(key=lambda note: note.get('createdAt', ''))
+        _cache_put(('notes', patient_id), notes)
+
+    return response_with_cors(200, notes)
 
 
 def get_note(event):
     patient_id = urllib.parse.unquote(event['pathParameters']['id'])
     note_id = urllib.parse.unquote(event['pathParameters']['noteId'])
 
-    response = table.get_item(Key={'id': patient_id, 'type': 'Patient'})
-
-    if 'Item' not in response or 'notes' not in response['Item']:
-        return response_with_cors(404, 'Note not found')
-
-    notes = response['Item']['notes']
-    note = next((note for note in notes if note['id'] == note_id), None)
+    response = get_client().get_item(TableName=TABLE_NAME, Key=_note_key(patient_id, note_id))
 
-    if not note:
+    if 'Item' not in response:
         return response_with_cors(404, 'Note not found')
 
-    return response_with_cors(200, note)
+    return response_with_cors(200, _note_from_item(response['Item']))
 
 
 def update_note(event):
     patient_id = urllib.parse.unquote(event['pathParameters']['id'])
     note_id = urllib.parse.unquote(event['pathParameters']['noteId'])
-    body = json.loads(event['body'])
-
-    response = table.get_item(Key={'id': patient_id, 'type': 'Patient'})
-
-    if 'Item' not in response or 'notes' not in response['Item']:
-        return response_with_cors(404, 'Note not found')
-
-    notes = response['Item']['notes']
-    note_index = next((i for i, note in enumerate(notes) if note['id'] == note_id), None)
-
-    if note_index is None:
-        return response_with_cors(404, 'Note not found')
-
-    for key, value in body.items():
-        notes[note_index][key] = value
-
-    notes[note_index]['updatedAt'] = datetime.now().isoformat()
-
-    response = table.update_item(
-        Key={'id': patient_id, 'type': 'Patient'},
-        UpdateExpression="SET notes = :notes",
-        ExpressionAttributeValues={
-            ':notes': notes
-        },
-        ReturnValues="ALL_NEW"
+    body = json_loads(event['body'])
+
+    # The key attributes and updatedAt are owned by the handler, not the client
+    for key in ('id', 'patientId', 'type', 'noteId', 'updatedAt'):
+        body.pop(key, None)
+
+    expression_attribute_names = {f"#k{i}": key for i, key in enumerate(body)}
+    expression_attribute_names['#id'] = 'id'
+    full = _wants_full(event)
+    expression_attribute_values = {f":v{i}": value for i, value in enumerate(body.values())}
+    update_expression = "SET " + ", ".join(
+        [f"#k{i} = :v{i}" for i in range(len(body))] + ["updatedAt = :updatedAt"]
     )
+    expression_attribute_values[':updatedAt'] = datetime.now().isoformat()
 
-    return response_with_cors(200, response['Attributes'])
+    try:
+        response = get_client().update_item(
+            TableName=TABLE_NAME,
+            Key=_note_key(patient_id, note_id),
+            UpdateExpression=update_expression,
+            ConditionExpression="attribute_exists(#id)",
+            ExpressionAttributeNames=expression_attribute_names,
+            ExpressionAttributeValues=_to_ddb(expression_attribute_values),
+            ReturnValues="ALL_NEW" if full else "UPDATED_NEW"
+        )
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+            return response_with_cors(404, 'Note not found')
+        raise
+
+    _cache_invalidate(patient_id)
+    if full:
+        return response_with_cors(200, _note_from_item(response['Attributes']))
+    return response_with_cors(200, _from_ddb(response['Attributes']))
 
 
 def delete_note(event):
     patient_id = urllib.parse.unquote(event['pathParameters']['id'])
     note_id = urllib.parse.unquote(event['pathParameters']['noteId'])
 
-    response = table.get_item(Key={'id': patient_id, 'type': 'Patient'})
-
-    if 'Item' not in response or 'notes' not in response['Item']:
-        return response_with_cors(404, 'Note not found')
+    get_client().delete_item(TableName=TABLE_NAME, Key=_note_key(patient_id, note_id))
+    _cache_invalidate(patient_id)
 
-    notes = response['Item']['notes']
-    new_notes = [note for note in notes if note['id'] != note_id]
+    return response_with_cors(204, None)
 
-    table.update_item(
-        Key={'id': patient_id, 'type': 'Patient'},
-        UpdateExpression="SET notes = :notes",
-        ExpressionAttributeValues={
-            ':notes': new_notes
-        }
-    )
 
-    return response_with_cors(204, None)
+def batch_get_notes(event):
+    patient_id = urllib.parse.unquote(event['pathParameters']['id'])
+    body = json_loads(event['body'])
+
+    note_ids = body.get('ids') if isinstance(body, dict) else None
+    if not isinstance(note_ids, list) or not note_ids:
+        return response_with_cors(400, 'Missing required field: ids must be a non-empty list.')
+    if not all(isinstance(note_id, str) for note_id in note_ids):
+        return response_with_cors(400, 'Invalid field: ids must be a list of strings.')
+    if len(note_ids) > BATCH_GET_MAX_IDS:
+        return response_with_cors(400, f'Too many ids: at most {BATCH_GET_MAX_IDS} notes can be read at once.')
+
+    # BatchGetItem rejects duplicate keys and takes at most 25 per call
+    sort_keys = dict.fromkeys(_note_sort_key(note_id) for note_id in note_ids)
+    keys = [{'id': {'S': patient_id}, 'type': {'S': sort_key}} for sort_key in sort_keys]
+
+    # Build the client before fanning out; concurrent first calls to get_client() would race
+    client = get_client()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        batches = executor.map(lambda chunk: _batch_get(client, chunk), _chunks(keys, 25))
+        notes = [_note_from_item(item) for items in batches for item in items]
+
+    return response_with_cors(200, notes)
+
+
+ROUTES = {
+    ('/patients', 'POST'): create_patient,
+    ('/patients/{id}', 'GET'): get_patient,
+    ('/patients/{id}', 'PUT'): update_patient,
+    ('/patients/{id}', 'DELETE'): delete_patient,
+    ('/patients/{id}/notes', 'POST'): add_note_to_patient,
+    ('/patients/{id}/notes', 'GET'): get_all_notes_for_patient,
+    ('/patients/{id}/notes/batch', 'POST'): batch_get_notes,
+    ('/patients/{id}/notes/{noteId}', 'GET'): get_note,
+    ('/patients/{id}/notes/{noteId}', 'PUT'): update_note,
+    ('/patients/{id}/notes/{noteId}', 'DELETE'): delete_note,
+}
@@ -0,0 +1,64 @@
+"""One-off migration: move the embedded `notes` list on each patient into sibling note items.
+
+Run it AFTER deploying the handler that stores notes as `id=<patient id>, type=Note#<note id>`
+items; run before, and any note the old handler appends after the scan is lost. Until it
+finishes, notes still embedded on a patient are not returned by the API.
+
+It is safe to rerun: migrated patients no longer carry a `notes` list and are skipped, and a
+patient interrupted midway is rewritten to the same keys.
+
+    python migrate_notes.py
+"""
+import importlib
+
+handler = importlib.import_module('lambda')
+
+
+def _unique_notes(patient_id, notes):
+    # The embedded list allowed duplicate ids (including `abc` next to `Note#abc`), which
+    # would collide on one key; keep the first and give later ones a deterministic new id
+    seen = set()
+    for note in notes:
+        # Ids stored as numbers come back as Decimal; note keys are strings
+        note_id = str(note['id'])
+        new_id = note_id
+        suffix = 2
+        while handler._note_sort_key(new_id) in seen:
+            new_id = f"{note_id}-{suffix}"
+            suffix += 1
+        if new_id != note_id:
+            print(f"Patient {patient_id}: duplicate note id {note_id} re-keyed to {new_id}")
+        seen.add(handler._note_sort_key(new_id))
+        yield {**note, 'id': new_id, 'patientId': patient_id}
+
+
+def migrate():
+    client = handler.get_client()
+    paginator = client.get_paginator('scan')
+    pages = paginator.paginate(
+        TableName=handler.TABLE_NAME,
+        FilterExpression="#type = :patient AND attribute_exists(notes)",
+        ProjectionExpression="id, #type, notes",
+        ExpressionAttributeNames={'#type': 'type'},
+        ExpressionAttributeValues={':patient': {'S': 'Patient'}}
+    )
+
+    for page in pages:
+        for item in page['Items']:
+            patient = handler._from_ddb(item)
+            requests = [
+                {'PutRequest': {'Item': handler._to_ddb(handler._note_item(note))}}
+                for note in _unique_notes(patient['id'], patient['notes'])
+            ]
+
+            handler._batch_write(requests)
+            client.update_item(
+                TableName=handler.TABLE_NAME,
+                Key=handler._patient_key(patient['id']),
+                UpdateExpression="REMOVE notes"
+            )
+            print(f"Migrated {len(requests)} notes for patient {patient['id']}")
+
+
+if __name__ == '__main__':
+    migrate()